@@ -116,7 +116,9 @@ NR>1 {
     # Store sequence only if type is S
     if(type=="S") {
         # Clean sequence: remove any character not A,C,G,T (case-insensitive)
-        gsub(/[^ACGTacgt]/,"",seq)
+        # (inline validation: removed characters are counted for the summary as invalid_chars)
+        cluster_removed[cluster] = gsub(/[^ACGTacgt]/,"",seq)
+        seq = toupper(seq)
         cluster_seq[cluster]=seq
     }
 }
@@ -172,11 +174,24 @@ END {
             output_file = small
         }
         
+        # Validate inline: a header without sequence bricks Diamond, so drop and report it
+        seq_len = length(sequence)
+        records_in[output_file]++
+        invalid_chars[output_file] += cluster_removed[cluster]
+        if(seq_len == 0) {
+            # Keep at most 100 headers per file (same limit as rnalab/fasta.py MAX_REPORTED_HEADERS)
+            if(++empty_records[output_file] <= 100) {
+                missing[output_file] = missing[output_file] "missing_sequence\t" header "\n"
+            }
+            continue
+        }
+        records_written[output_file]++
+        bases_written[output_file] += seq_len
+        
         # Write header
         print header > output_file
         
         # Write sequence in 80-character lines (more efficient method)
-        seq_len = length(sequence)
         for(i = 1; i <= seq_len; i += 80) {
             end_pos = (i + 79 <= seq_len) ? i + 79 : seq_len
             print substr(sequence, i, end_pos - i + 1) > output_file
@@ -188,6 +203,23 @@ END {
     close(medium)
     close(large)
     
+    # Per-file validation summary written alongside each output (replaces the separate check pass)
+    n = split(small SUBSEP medium SUBSEP large, outputs, SUBSEP)
+    for(f = 1; f <= n; f++) {
+        out = outputs[f]
+        summary = out ".validation.tsv"
+        printf "output\t%s\nstatus\tok\nalphabet\tACGT\nline_width\t80\n", out > summary
+        printf "records_in\t%d\nrecords_written\t%d\n", records_in[out], records_written[out] > summary
+        printf "empty_records\t%d\nempty_records_dropped\t%d\n", empty_records[out], empty_records[out] > summary
+        printf "invalid_chars\t%d\ninvalid_action\tremoved\n", invalid_chars[out] > summary
+        printf "bases_written\t%d\n", bases_written[out] > summary
+        printf "%s", missing[out] > summary
+        close(summary)
+        if(empty_records[out] > 0) {
+            printf "Warning: dropped %d clusters with missing sequence from %s\n", empty_records[out], out > "/dev/stderr"
+        }
+    }
+    
     printf "Output writing complete.\n" > "/dev/stderr"
     if(mode == "percent") {
         printf "Filtered out %d clusters with <=%g%% %s presence\n", filtered_out, cutoff, label > "/dev/stderr"
@@ -200,4 +232,5 @@ END {
 echo "Splitting complete. Checking output files..."
 echo "Small clusters (<3): $(grep -c "^>" "$OUTPUT_SMALL" 2>/dev/null || echo 0) sequences"
 echo "Medium clusters (3-5): $(grep -c "^>" "$OUTPUT_MEDIUM" 2>/dev/null || echo 0) sequences"
-echo "Large clusters (>5): $(grep -c "^>" "$OUTPUT_LARGE" 2>/dev/null || echo 0) sequences"
\ No newline at end of file
+echo "Large clusters (>5): $(grep -c "^>" "$OUTPUT_LARGE" 2>/dev/null || echo 0) sequences"
+echo "Validation summaries written to <output>.validation.tsv"
\ No newline at end of file
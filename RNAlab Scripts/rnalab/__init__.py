@@ -0,0 +1,57 @@
+"""
+RNAlab pipeline stages as an importable library.
+
+The stages can be called in-process and chained without intermediate files;
+every function that reads or writes takes a path or an open stream/iterable:
+
+    import rnalab
+
+    hits = rnalab.parse_diamond_hits('hits.m8')
+    records = rnalab.filter_records(rnalab.read_fasta('clusters.fa'), hits)
+
+Submodules are only imported when one of their names is first used, so
+`import rnalab` (and every console entry point) stays fast.
+"""
+
+import importlib
+
+__version__ = "0.1.0"
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'iter_uc': 'polymorph',
+    'parse_uc': 'polymorph',
+    'parse_tsv': 'collector',
+    'calculate_organism_percentage': 'collector',
+    'filter_clusters': 'collector',
+    'write_filtered_fasta': 'collector',
+    'parse_diamond_hits': 'diamond_breaker',
+    'filter_records': 'diamond_breaker',
+    'filter_fasta': 'diamond_breaker',
+    'merge_data': 'merger',
+    'csv_records': 'converter',
+    'convert_csv': 'converter',
+    'FastaWriter': 'fasta',
+    'read_fasta': 'fasta',
+    'scan_clusters': 'stats',
+    'build_histograms': 'stats',
+    'open_input': 'streams',
+    'open_output': 'streams',
+    'threaded_input': 'pipeline',
+    'threaded_output': 'pipeline',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,61 @@
+"""
+Convert a CSV with Contig_ID and Sequence columns to FASTA.
+"""
+
+import csv
+import argparse
+
+from .fasta import FastaWriter
+from .streams import open_input, status_stream
+
+
+def csv_records(lines, id_column='Contig_ID', sequence_column='Sequence'):
+    """
+    Iterate over (header, sequence) records of a contig CSV.
+
+    Args:
+        lines: Path, open file or iterable of CSV lines (including the header row)
+        id_column: Column used as the FASTA header
+        sequence_column: Column holding the sequence
+    """
+    with open_input(lines) as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            yield row[id_column], row[sequence_column]
+
+
+def convert_csv(input_csv, output_fasta, id_column='Contig_ID', sequence_column='Sequence'):
+    """
+    Read CSV and write FASTA.
+
+    Args:
+        input_csv: Path, open file or iterable of CSV lines
+        output_fasta: Path or open stream for the FASTA output
+
+    Returns:
+        The closed FastaWriter, for its record counts
+    """
+    with FastaWriter(output_fasta) as fasta:
+        for header, sequence in csv_records(input_csv, id_column, sequence_column):
+            fasta.write(header, sequence)
+    return fasta
+
+
+def main(argv=None):
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description="Convert a CSV to FASTA")
+    parser.add_argument("-i", "--input", required=True, help="Path to input CSV file")
+    parser.add_argument("-o", "--output", required=True, help="Path to output FASTA file")
+    args = parser.parse_args(argv)
+
+    fasta = convert_csv(args.input, args.output)
+    log = status_stream(args.output)
+
+    print(f"FASTA file saved as {args.output} ({fasta.records_written} records, "
+          f"{fasta.empty_records} with missing sequence dropped)", file=log)
+    if fasta.summary:
+        print(f"Validation summary saved as {fasta.summary_file}", file=log)
+
+
+if __name__ == "__main__":
+    main()
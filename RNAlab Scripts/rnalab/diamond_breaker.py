@@ -0,0 +1,157 @@
+"""
+Remove Diamond hits from original FASTA dataset based on cluster numbers
+"""
+
+import re
+import argparse
+from typing import Iterable, Iterator, Set, Tuple
+
+from .fasta import SUMMARY_SUFFIX, FastaWriter, read_fasta
+from .pipeline import (DEFAULT_BLOCK_SIZE, DEFAULT_QUEUE_BLOCKS, add_pipeline_arguments,
+                       input_stage, output_stage, pipeline_options)
+from .streams import is_path, is_std_stream, open_input, status_stream
+
+def parse_diamond_hits(diamond_file: str) -> Set[str]:
+    """
+    Parse Diamond output file and extract cluster numbers from hits
+    
+    Args:
+        diamond_file: Path to Diamond output file, open file or iterable of lines
+        
+    Returns:
+        Set of cluster numbers that had hits
+    """
+    hit_clusters = set()
+    
+    with open_input(diamond_file) as f:
+        for line in f:
+            line = line.strip()
+            if line and line.startswith('cluster_num='):
+                # Extract cluster number from first column
+                cluster_num = line.split('\t')[0].replace('cluster_num=', '')
+                hit_clusters.add(cluster_num)
+    
+    return hit_clusters
+
+def filter_records(records: Iterable[Tuple[str, str]], hit_clusters: Set[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Drop records whose cluster number had Diamond hits
+    
+    Args:
+        records: (header, sequence) tuples, e.g. from read_fasta
+        hit_clusters: Set of cluster numbers to remove
+        
+    Yields:
+        (header, sequence) tuples of the records to keep
+    """
+    for header, sequence in records:
+        if should_keep_sequence(header, hit_clusters):
+            yield header, sequence
+
+def filter_fasta(input_fasta, output_fasta, hit_clusters: Set[str], pipelined: bool = False,
+                 block_size: int = DEFAULT_BLOCK_SIZE, queue_blocks: int = DEFAULT_QUEUE_BLOCKS,
+                 log=None):
+    """
+    Filter FASTA file to remove sequences with cluster numbers that had Diamond hits
+    
+    Args:
+        input_fasta: Path to input FASTA file, open file or iterable of lines
+        output_fasta: Path to output filtered FASTA file or open stream
+        hit_clusters: Set of cluster numbers to remove
+        pipelined: Read and write on background threads (see rnalab.pipeline)
+        block_size: Bytes per read/write block when pipelined
+        queue_blocks: Blocks queued between threads when pipelined
+        log: Stream for status messages (default: stderr if output_fasta is '-', else stdout)
+        
+    Returns:
+        (sequences_kept, sequences_removed)
+    """
+    log = status_stream(output_fasta) if log is None else log
+    sequences_kept = 0
+    sequences_removed = 0
+    summary_file = (str(output_fasta) + SUMMARY_SUFFIX
+                    if is_path(output_fasta) and not is_std_stream(output_fasta) else None)
+    limits = {'pipelined': pipelined, 'block_size': block_size, 'queue_blocks': queue_blocks}
+    
+    with input_stage(input_fasta, **limits) as lines, \
+            output_stage(output_fasta, binary=True, **limits) as stream, \
+            FastaWriter(stream, summary_file=summary_file) as outfile:
+        for header, sequence in read_fasta(lines):
+            if should_keep_sequence(header, hit_clusters, log):
+                outfile.write(header, sequence)
+                sequences_kept += 1
+            else:
+                sequences_removed += 1
+    
+    print(f"Filtering complete:", file=log)
+    print(f"  Sequences kept: {sequences_kept}", file=log)
+    print(f"  Sequences removed: {sequences_removed}", file=log)
+    print(f"  Total processed: {sequences_kept + sequences_removed}", file=log)
+    print(f"  Missing sequence (dropped): {outfile.empty_records}", file=log)
+    if outfile.summary:
+        print(f"  Validation summary: {outfile.summary_file}", file=log)
+    
+    return sequences_kept, sequences_removed
+
+def should_keep_sequence(header: str, hit_clusters: Set[str], log=None) -> bool:
+    """
+    Determine if a sequence should be kept based on its cluster number
+    
+    Args:
+        header: FASTA header line
+        hit_clusters: Set of cluster numbers to remove
+        log: Stream for warnings (default: stdout)
+        
+    Returns:
+        True if sequence should be kept, False if it should be removed
+    """
+    # Extract cluster number from header using regex
+    cluster_match = re.search(r'cluster_num=(\d+)', header)
+    if cluster_match:
+        cluster_num = cluster_match.group(1)
+        return cluster_num not in hit_clusters
+    else:
+        # If no cluster number found, keep the sequence by default
+        print(f"Warning: No cluster number found in header: {header}", file=log)
+        return True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Remove Diamond hits from FASTA dataset')
+    parser.add_argument('diamond_file', help='Diamond output file')
+    parser.add_argument('input_fasta', help='Input FASTA file')
+    parser.add_argument('output_fasta', help='Output filtered FASTA file')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+    add_pipeline_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    log = status_stream(args.output_fasta)
+    
+    print("Parsing Diamond hits...", file=log)
+    hit_clusters = parse_diamond_hits(args.diamond_file)
+    print(f"Found {len(hit_clusters)} unique cluster numbers with hits", file=log)
+    
+    if args.verbose:
+        print("Cluster numbers to remove:", file=log)
+        for cluster in sorted(hit_clusters, key=int):
+            print(f"  cluster_num={cluster}", file=log)
+    
+    print("\nFiltering FASTA file...", file=log)
+    filter_fasta(args.input_fasta, args.output_fasta, hit_clusters, log=log, **pipeline_options(args))
+
+if __name__ == "__main__":
+    main()
+
+# Example usage:
+# python Diamond.breaker.py diamond_hits.txt input.fasta filtered_output.fasta
+# rnalab-diamond-breaker diamond_hits.txt input.fasta filtered_output.fasta
+
+# You can also use the functions directly:
+"""
+from rnalab import parse_diamond_hits, filter_fasta
+
+# Parse diamond hits
+hit_clusters = parse_diamond_hits('diamond_hits.txt')
+
+# Filter FASTA
+filter_fasta('original_dataset.fasta', 'filtered_dataset.fasta', hit_clusters)
+"""
@@ -0,0 +1,255 @@
+"""
+FASTA reading and a shared writer that validates and normalizes records as they are written.
+
+Diamond2 falls over on malformed FASTA (a header with no sequence, stray
+characters in the sequence), which used to mean a separate awk pass over every
+output file. Writing through FastaWriter does the same checks inline:
+
+  - records whose sequence is empty (before or after cleaning) are dropped
+    and reported instead of written
+  - sequences are upper-cased and any character outside the alphabet is
+    replaced by N, so lengths and coordinates are kept (deleting them instead
+    is an explicit option); this is one bytes translate table, with no
+    per-character Python loop
+  - sequences are wrapped at a fixed line width
+
+A per-file validation summary is written next to the output as
+<output>.validation.tsv when the writer is closed. If the writer is closed by
+an exception (used as a context manager) the summary says `status failed`, so
+a partial output is never mistaken for a complete one.
+"""
+
+import contextlib
+import sys
+
+from .streams import is_path, is_std_stream, is_text_stream, open_input, open_output
+
+DEFAULT_ALPHABET = 'ACGTN'
+INVALID_CHAR = 'N'
+WHITESPACE = b' \t\n\r\v\f'
+DEFAULT_WIDTH = 80
+SUMMARY_SUFFIX = '.validation.tsv'
+MAX_REPORTED_HEADERS = 100
+
+
+def build_translate_table(alphabet=DEFAULT_ALPHABET, invalid=INVALID_CHAR):
+    """
+    Build the (table, deletechars) pair used by bytes.translate.
+
+    Letters of the alphabet are mapped to uppercase and whitespace (line
+    breaks) is deleted. Every other byte is replaced by `invalid`, which is
+    always allowed itself, or deleted if `invalid` is None.
+    """
+    allowed = set((alphabet + (invalid or '')).upper().encode('ascii'))
+    table = bytearray(range(256)) if invalid is None else bytearray(ord(invalid.upper()) for _ in range(256))
+    for byte in allowed:
+        table[byte] = byte
+        table[ord(chr(byte).lower())] = byte
+    valid = {byte for byte in range(256) if table[byte] in allowed}
+    delete = bytes(byte for byte in range(256)
+                   if byte in WHITESPACE or (invalid is None and byte not in valid))
+    return bytes(table), delete
+
+
+def clean_sequence(sequence, table, delete):
+    """
+    Normalize a sequence with a prepared translate table.
+
+    Args:
+        sequence: Sequence as str or bytes (line breaks are removed)
+        table, delete: Output of build_translate_table
+
+    Returns:
+        Cleaned sequence as bytes
+    """
+    if isinstance(sequence, str):
+        # One '?' per non-ASCII character, which the table then treats as invalid
+        sequence = sequence.encode('ascii', 'replace')
+    return sequence.translate(table, delete)
+
+
+def wrap_sequence(sequence, width=DEFAULT_WIDTH):
+    """Wrap a bytes sequence into newline-terminated lines of `width` characters."""
+    if width <= 0:
+        return sequence + b'\n'
+    return b''.join(sequence[i:i + width] + b'\n' for i in range(0, len(sequence), width))
+
+
+def read_fasta(source):
+    """
+    Iterate over the records of a FASTA file.
+
+    Args:
+        source: Path, open file or iterable of lines
+
+    Yields:
+        (header, sequence) tuples; the header keeps its leading '>' and
+        sequence lines are joined without line breaks
+    """
+    with open_input(source) as lines:
+        header = None
+        sequence = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('>'):
+                if header is not None:
+                    yield header, ''.join(sequence)
+                header = line
+                sequence = []
+            elif header is not None:
+                sequence.append(line)
+        if header is not None:
+            yield header, ''.join(sequence)
+
+
+class FastaWriter:
+    """
+    Validating FASTA writer.
+
+    Usage:
+        with FastaWriter('out.fa') as writer:
+            writer.write('>cluster_num=1 cluster_size=4', 'ACGTNacgt')
+    """
+
+    def __init__(self, output_file, width=DEFAULT_WIDTH, alphabet=DEFAULT_ALPHABET,
+                 drop_empty=True, summary=True, summary_file=None, invalid=INVALID_CHAR):
+        """
+        Args:
+            output_file: Path to output FASTA file ('.gz'/'.zst' are compressed),
+                         or an open text or binary stream
+            width: Sequence line width (0 writes each sequence on one line)
+            alphabet: Characters allowed in sequences (case-insensitive)
+            drop_empty: Drop records with no sequence left after cleaning;
+                        if False they are written with the header only and still reported
+            summary: Write the validation summary on close
+            summary_file: Where to write it; defaults to <output_file>.validation.tsv
+                          for path outputs (streams get no summary unless this is given)
+            invalid: Character that replaces anything outside the alphabet, or
+                     None to delete those characters (shifts coordinates)
+        """
+        self.output_file = str(output_file) if is_path(output_file) else getattr(output_file, 'name', '<stream>')
+        self.width = width
+        self.alphabet = alphabet.upper()
+        self.invalid = invalid.upper() if invalid else None
+        self.drop_empty = drop_empty
+        # '-' (stdout) has no file name to put the summary next to
+        if summary_file is None and is_path(output_file) and not is_std_stream(output_file):
+            summary_file = self.output_file + SUMMARY_SUFFIX
+        self.summary_file = summary_file
+        self.summary = summary and summary_file is not None
+        self._table, self._delete = build_translate_table(alphabet, self.invalid)
+        self._stack = contextlib.ExitStack()
+        self._handle = self._stack.enter_context(open_output(output_file, binary=True))
+        self._text = is_text_stream(self._handle)
+        self.closed = False
+        self.failed = False
+
+        self.records_in = 0
+        self.records_written = 0
+        self.empty_records = 0
+        self.invalid_chars = 0
+        self.bases_written = 0
+        self.empty_headers = []
+
+    def write(self, header, sequence):
+        """
+        Validate, clean and write one record.
+
+        Args:
+            header: Header line, with or without the leading '>' (written as UTF-8)
+            sequence: Sequence as str or bytes, optionally containing line breaks
+
+        Returns:
+            True if the record was written, False if it was dropped
+        """
+        self.records_in += 1
+        if isinstance(header, bytes):
+            # surrogateescape passes bytes that are not valid UTF-8 through unchanged
+            header = header.decode('utf-8', 'surrogateescape')
+        header = header.strip()
+        if not header.startswith('>'):
+            header = '>' + header
+
+        if isinstance(sequence, str):
+            sequence = sequence.encode('ascii', 'replace')
+        cleaned = clean_sequence(sequence, self._table, self._delete)
+        if self.invalid:
+            # Every replaced character became the invalid character; count those that were not it already
+            marker = self.invalid.encode('ascii')
+            self.invalid_chars += (cleaned.count(marker) - sequence.count(marker)
+                                   - sequence.count(marker.lower()))
+        else:
+            # Whitespace is deleted too but is not an invalid character
+            self.invalid_chars += len(sequence.translate(None, WHITESPACE)) - len(cleaned)
+
+        if not cleaned:
+            self.empty_records += 1
+            if len(self.empty_headers) < MAX_REPORTED_HEADERS:
+                self.empty_headers.append(header)
+            if self.drop_empty:
+                return False
+
+        record = header.encode('utf-8', 'surrogateescape') + b'\n'
+        if cleaned:
+            record += wrap_sequence(cleaned, self.width)
+        self._handle.write(record.decode('utf-8', 'replace') if self._text else record)
+        self.records_written += 1
+        self.bases_written += len(cleaned)
+        return True
+
+    def close(self, failed=False):
+        """
+        Close the output file (if opened here) and write the validation summary.
+
+        Args:
+            failed: The records were not all written (an error interrupted the
+                    caller); the summary is marked failed
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.failed = failed
+        try:
+            if not failed:
+                # Surfaces write errors still pending in the stream (e.g. from a
+                # pipelined writer thread) before the summary calls the output ok
+                self._handle.flush()
+            self._stack.close()
+        except BaseException:
+            self.failed = True
+            raise
+        finally:
+            if self.summary:
+                self.write_summary()
+        if self.empty_records and not self.failed:
+            action = 'dropped' if self.drop_empty else 'written without sequence'
+            print(f"Warning: {self.empty_records} records with missing sequence {action} "
+                  f"in {self.output_file}", file=sys.stderr)
+
+    def write_summary(self, summary_file=None):
+        """Write validation counts (and headers of empty records) as a two-column TSV."""
+        summary_file = summary_file or self.summary_file or self.output_file + SUMMARY_SUFFIX
+        with open(summary_file, 'w', encoding='utf-8', errors='surrogateescape') as f:
+            f.write(f"output\t{self.output_file}\n")
+            f.write(f"status\t{'failed' if self.failed else 'ok'}\n")
+            f.write(f"alphabet\t{self.alphabet}\n")
+            f.write(f"line_width\t{self.width}\n")
+            f.write(f"records_in\t{self.records_in}\n")
+            f.write(f"records_written\t{self.records_written}\n")
+            f.write(f"empty_records\t{self.empty_records}\n")
+            f.write(f"empty_records_dropped\t{self.empty_records if self.drop_empty else 0}\n")
+            f.write(f"invalid_chars\t{self.invalid_chars}\n")
+            f.write(f"invalid_action\t{'replaced with ' + self.invalid if self.invalid else 'removed'}\n")
+            f.write(f"bases_written\t{self.bases_written}\n")
+            for header in self.empty_headers:
+                f.write(f"missing_sequence\t{header}\n")
+        return summary_file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(failed=exc_type is not None)
+        return False
@@ -0,0 +1,315 @@
+"""
+Threaded read/parse/write pipelining for the streaming stages.
+
+Run single-threaded, a stage waits for the disk while parsing and leaves the
+disk idle while it parses, so its time is read + compute + write. With
+pipelining enabled:
+
+  - a reader thread reads large byte blocks (and decompresses .gz/.zst inputs)
+  - the calling thread splits the blocks into lines and does the parse/transform
+  - a writer thread drains a bounded queue of output blocks (and compresses)
+
+File I/O and zlib/zstd (de)compression release the GIL, so the three overlap
+and end-to-end time approaches max(read, compute, write).
+
+Both queues are bounded; when one is full the producing side blocks
+(backpressure). Memory in flight is therefore at most about
+(2 * queue_blocks + 2) * block_size bytes.
+"""
+
+import argparse
+import contextlib
+import io
+import queue
+import threading
+
+from .streams import is_path, is_text_stream, open_input, open_output
+
+DEFAULT_BLOCK_SIZE = 4 << 20  # 4 MiB
+DEFAULT_QUEUE_BLOCKS = 8
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+def _check_limits(block_size, queue_blocks):
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1 byte")
+    if queue_blocks < 1:
+        raise ValueError("queue_blocks must be at least 1")
+
+
+def _read_blocks(f, block_size, blocks, stop, errors):
+    """Reader thread: put byte blocks (or batches of lines) of `f` on `blocks` until done or stopped."""
+    try:
+        if hasattr(f, 'read') and not is_text_stream(f):
+            chunks = iter(lambda: f.read(block_size), b'')
+        else:
+            chunks = _batch_lines(f, block_size)
+        for chunk in chunks:
+            while not stop.is_set():
+                try:
+                    blocks.put(chunk, timeout=_POLL_SECONDS)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                return
+    except BaseException as e:
+        errors.append(e)
+    finally:
+        while not stop.is_set():
+            try:
+                blocks.put(_DONE, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+
+
+def _batch_lines(lines, block_size):
+    """Group an iterable of text lines into lists of roughly block_size characters."""
+    batch = []
+    size = 0
+    for line in lines:
+        batch.append(line)
+        size += len(line)
+        if size >= block_size:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+def _split_lines(blocks, errors, encoding):
+    """Parse stage: turn byte blocks into text lines, carrying partial lines over."""
+    remainder = b''
+    while True:
+        block = blocks.get()
+        if block is _DONE:
+            break
+        if isinstance(block, list):
+            yield from block
+            continue
+        # Cut at the last newline so lines (and multi-byte characters) are never split
+        cut = block.rfind(b'\n') + 1
+        if not cut:
+            remainder += block
+            continue
+        # Same line splitting and decoding as iterating over a file opened with newline=''
+        yield from io.TextIOWrapper(io.BytesIO(remainder + block[:cut]), encoding=encoding, newline='')
+        remainder = block[cut:]
+    if errors:
+        raise errors[0]
+    if remainder:
+        yield remainder.decode(encoding)
+
+
+@contextlib.contextmanager
+def threaded_input(source, block_size=DEFAULT_BLOCK_SIZE, queue_blocks=DEFAULT_QUEUE_BLOCKS,
+                   encoding='utf-8'):
+    """
+    Read `source` on a background thread.
+
+    Args:
+        source: Path, '-', open file or iterable of lines (see streams.open_input)
+        block_size: Bytes per read
+        queue_blocks: Blocks that may wait for the parser before the reader blocks
+        encoding: Text encoding for binary inputs
+
+    Yields:
+        An iterator of text lines (with line endings)
+    """
+    _check_limits(block_size, queue_blocks)
+    blocks = queue.Queue(maxsize=queue_blocks)
+    stop = threading.Event()
+    errors = []
+    # Opened here rather than on the reader thread, so a missing input fails
+    # before the caller goes on to create its output
+    with open_input(source, binary=is_path(source)) as f:
+        reader = threading.Thread(target=_read_blocks, args=(f, block_size, blocks, stop, errors),
+                                  name='rnalab-reader', daemon=True)
+        reader.start()
+        try:
+            yield _split_lines(blocks, errors, encoding)
+        finally:
+            # Unblock the reader if the consumer stopped early
+            stop.set()
+            reader.join()
+    if errors:
+        raise errors[0]
+
+
+class QueueWriter:
+    """
+    File-like object whose writes are batched into blocks and written by a background thread.
+
+    write() only appends to an in-memory buffer; once it reaches block_size the
+    block is queued for the writer thread, blocking while `queue_blocks` blocks
+    are already waiting (backpressure). flush() waits until everything written
+    so far has reached the stream and the stream has been flushed. Errors from
+    the writer thread are raised by the next write(), flush() or close().
+    """
+
+    def __init__(self, stream, block_size=DEFAULT_BLOCK_SIZE, queue_blocks=DEFAULT_QUEUE_BLOCKS,
+                 encoding='utf-8'):
+        """
+        Args:
+            stream: Open stream to write to
+            block_size: Buffered characters/bytes per queued block
+            queue_blocks: Blocks that may wait for the writer before write() blocks
+            encoding: Used on the writer thread when str is written to a binary
+                      stream or bytes to a text stream
+        """
+        _check_limits(block_size, queue_blocks)
+        self.stream = stream
+        self.block_size = block_size
+        self.encoding = encoding
+        self._text = is_text_stream(stream)
+        self.name = getattr(stream, 'name', '<stream>')
+        self.closed = False
+        self._buffer = []
+        self._buffered = 0
+        self._blocks = queue.Queue(maxsize=queue_blocks)
+        self._errors = []
+        self._thread = threading.Thread(target=self._drain, name='rnalab-writer', daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        while True:
+            block = self._blocks.get()
+            if block is _DONE:
+                return
+            if isinstance(block, threading.Event):
+                # flush() request: flush the stream, then wake the waiting caller
+                try:
+                    if not self._errors:
+                        self.stream.flush()
+                except BaseException as e:
+                    self._errors.append(e)
+                finally:
+                    block.set()
+                continue
+            if self._errors:
+                continue  # keep draining so write() never blocks on a dead writer
+            try:
+                if self._text and isinstance(block, bytes):
+                    block = block.decode(self.encoding)
+                elif not self._text and isinstance(block, str):
+                    block = block.encode(self.encoding)
+                self.stream.write(block)
+            except BaseException as e:
+                self._errors.append(e)
+
+    def write(self, data):
+        if self._errors:
+            raise self._errors[0]
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.block_size:
+            self._queue_buffer()
+        return len(data)
+
+    def _queue_buffer(self):
+        if self._buffer:
+            first = self._buffer[0]
+            self._blocks.put((b'' if isinstance(first, bytes) else '').join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+
+    def flush(self):
+        """Write out the buffer, flush the stream on the writer thread and wait for it."""
+        if self.closed:
+            return
+        self._queue_buffer()
+        flushed = threading.Event()
+        self._blocks.put(flushed)
+        flushed.wait()
+        if self._errors:
+            raise self._errors[0]
+
+    def close(self):
+        """Queue the remaining buffer, wait for the writer thread and re-raise its errors."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue_buffer()
+        self._blocks.put(_DONE)
+        self._thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+@contextlib.contextmanager
+def threaded_output(destination, binary=False, block_size=DEFAULT_BLOCK_SIZE,
+                    queue_blocks=DEFAULT_QUEUE_BLOCKS, encoding='utf-8'):
+    """
+    Write `destination` on a background thread.
+
+    Args:
+        destination: Path, '-' or open stream (see streams.open_output)
+        binary: Caller writes bytes instead of str
+        block_size: Buffered characters/bytes per queued block
+        queue_blocks: Blocks that may wait for the writer before writes block
+        encoding: Text encoding used when writing str to a file path
+
+    Yields:
+        A QueueWriter
+    """
+    # Paths are opened in binary mode; text is encoded on the writer thread
+    with open_output(destination, binary=binary or is_path(destination)) as stream:
+        with QueueWriter(stream, block_size, queue_blocks, encoding) as writer:
+            yield writer
+
+
+def input_stage(source, pipelined=False, block_size=DEFAULT_BLOCK_SIZE,
+                queue_blocks=DEFAULT_QUEUE_BLOCKS):
+    """Text lines of `source`, read on a background thread if `pipelined`."""
+    if pipelined:
+        return threaded_input(source, block_size, queue_blocks)
+    return open_input(source)
+
+
+def output_stage(destination, binary=False, pipelined=False, block_size=DEFAULT_BLOCK_SIZE,
+                 queue_blocks=DEFAULT_QUEUE_BLOCKS):
+    """Writable stream for `destination`, written on a background thread if `pipelined`."""
+    if pipelined:
+        return threaded_output(destination, binary, block_size, queue_blocks)
+    return open_output(destination, binary)
+
+
+def _positive(convert):
+    def parse(value):
+        number = convert(value)
+        if number <= 0:
+            raise argparse.ArgumentTypeError(f"must be greater than 0 (got {value})")
+        return number
+    parse.__name__ = convert.__name__  # argparse names the type in its error messages
+    return parse
+
+
+def add_pipeline_arguments(parser):
+    """Add the --pipelined / --block-size-mb / --queue-blocks options to a stage's parser."""
+    parser.add_argument('--pipelined', action='store_true',
+                        help='Overlap reading, parsing and writing using reader and writer threads')
+    parser.add_argument('--block-size-mb', type=_positive(float), default=DEFAULT_BLOCK_SIZE / (1 << 20),
+                        help='Size of each read/write block in MiB with --pipelined (default: %(default)g)')
+    parser.add_argument('--queue-blocks', type=_positive(int), default=DEFAULT_QUEUE_BLOCKS,
+                        help='Blocks queued between threads before the producer waits; memory in flight is '
+                             'about (2 x queue-blocks + 2) x block size (default: %(default)s)')
+
+
+def pipeline_options(args):
+    """Keyword arguments for a stage function from parsed add_pipeline_arguments options."""
+    return {
+        'pipelined': args.pipelined,
+        'block_size': max(1, int(args.block_size_mb * (1 << 20))),
+        'queue_blocks': args.queue_blocks,
+    }
@@ -0,0 +1,61 @@
+"""
+Convert a Usearch .uc file to a .tsv with a header row.
+"""
+
+import argparse
+import csv
+
+from .streams import open_input, open_output
+
+UC_HEADER = [
+    "RecordType", "Cluster", "Length", "PctId", "Strand",
+    "Mismatch", "GapOpen", "Qlo", "Qhi", "Tlo", "Thi",
+    "Evalue", "BitScore", "Query", "Target"
+]
+
+
+def iter_uc(lines):
+    """
+    Iterate over the records of a .uc file.
+
+    Args:
+        lines: Iterable of .uc lines (an open file works)
+
+    Yields:
+        Lists of fields padded/truncated to the length of UC_HEADER
+    """
+    for line in lines:
+        if line.startswith("#") or not line.strip():
+            continue  # skip comments and blanks
+        fields = line.strip().split("\t")
+        # pad to header length if shorter
+        while len(fields) < len(UC_HEADER):
+            fields.append("")
+        yield fields[:len(UC_HEADER)]
+
+
+def parse_uc(uc_file, tsv_file):
+    """
+    Convert a .uc file to .tsv.
+
+    Args:
+        uc_file: Path, open file or iterable of .uc lines
+        tsv_file: Path or open text stream for the .tsv output
+    """
+    with open_input(uc_file) as infile, open_output(tsv_file) as outfile:
+        writer = csv.writer(outfile, delimiter="\t")
+        writer.writerow(UC_HEADER)
+        writer.writerows(iter_uc(infile))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert .uc file to .tsv")
+    parser.add_argument("--input", "-i", required=True, help="Input .uc file")
+    parser.add_argument("--output", "-o", required=True, help="Output .tsv file")
+    args = parser.parse_args(argv)
+
+    parse_uc(args.input, args.output)
+
+
+if __name__ == "__main__":
+    main()
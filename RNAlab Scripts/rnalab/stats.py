@@ -0,0 +1,407 @@
+"""
+Quick-look cluster statistics over a Usearch .uc file or Polymorph/annotated TSV.
+
+Reports histograms of cluster size, target species fraction per cluster and
+distinct SRRs per cluster, so Subsplitter cutoffs and Collector thresholds can be
+picked without running the whole pipeline.
+
+Two modes share the same interface and output:
+  --approx  samples clusters (bottom-k reservoir over a hash of the cluster number)
+            and counts distinct SRRs with HyperLogLog sketches; only the sampled
+            clusters are fully parsed and kept in memory. Bin counts are scaled up
+            to all clusters and reported with 95% error bounds.
+  default   exact counts over every cluster, for confirming the chosen cutoffs.
+"""
+
+import argparse
+import bisect
+import hashlib
+import heapq
+import itertools
+import math
+import time
+import zlib
+from pathlib import Path
+
+from .streams import open_input
+
+# Lower edges of the cluster size / distinct SRR bins (matches Subsplitter's <3, 3-5, >5 split)
+DEFAULT_SIZE_BINS = [1, 2, 3, 6, 11, 101]
+DEFAULT_SAMPLE_SIZE = 10000
+DEFAULT_HLL_PRECISION = 8
+QUERY_LABEL_COLUMN = 8  # Column 9 of the .uc file
+Z_95 = 1.96
+MASK64 = (1 << 64) - 1
+
+
+class HyperLogLog:
+    """
+    Minimal HyperLogLog sketch for distinct counts.
+
+    Uses 2**precision one-byte registers; the relative standard error of the
+    estimate is about 1.04 / sqrt(2**precision). Values are kept in an exact set
+    until there are more than `sparse_limit` of them (like the sparse mode of
+    HLL++), so typical clusters with a handful of SRRs are counted exactly and
+    do not suffer from register collisions.
+    """
+
+    def __init__(self, precision=DEFAULT_HLL_PRECISION, sparse_limit=None):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        self.precision = precision
+        self.m = 1 << precision
+        self.alpha = 0.7213 / (1 + 1.079 / self.m)
+        self.sparse_limit = self.m // 8 if sparse_limit is None else sparse_limit
+        self.sparse = set()
+        self.registers = None
+
+    def add(self, value):
+        """Add a string value to the sketch."""
+        if self.registers is None:
+            self.sparse.add(value)
+            if len(self.sparse) > self.sparse_limit:
+                self.registers = bytearray(self.m)
+                for item in self.sparse:
+                    self._add_hashed(item)
+                self.sparse = None
+            return
+        self._add_hashed(value)
+
+    def _add_hashed(self, value):
+        x = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+        index = x >> (64 - self.precision)
+        rest = (x << self.precision) & MASK64
+        rank = (64 - self.precision + 1) if rest == 0 else (65 - rest.bit_length())
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        """Return the estimated number of distinct values added."""
+        if self.registers is None:
+            return len(self.sparse)
+        estimate = self.alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(self.m)
+
+
+def extract_srr(query_label):
+    """
+    Extract the run accession from a query label.
+    For 'DRR220096_248502_circle_248502_1 [103 - 375]', return 'DRR220096'
+    """
+    fields = query_label.split('_', 1)[0].split()
+    return fields[0] if fields else None
+
+
+def detect_columns(first_line, species_column=None, organism=None):
+    """
+    Work out whether the file has a header and where the needed columns are.
+
+    Args:
+        first_line: First line of the input
+        species_column: Target organism column index (0-based), if given
+        organism: Target organism column name, looked up in the header
+
+    Returns:
+        (has_header, query_label_column, species_column, organism_name)
+    """
+    parts = first_line.rstrip('\n').split('\t')
+    has_header = parts[0] in ('RecordType', 'record_type')
+    query_column = QUERY_LABEL_COLUMN
+    organism_name = None
+
+    if has_header:
+        stripped = [name.strip() for name in parts]
+        if 'query_label' in stripped:
+            query_column = stripped.index('query_label')
+        if organism:
+            if organism not in stripped:
+                raise ValueError(f"Organism '{organism}' not found in header. "
+                                 f"Available columns: {', '.join(stripped)}")
+            species_column = stripped.index(organism)
+        if species_column is not None and species_column < len(stripped):
+            organism_name = stripped[species_column]
+    elif organism:
+        raise ValueError(f"Input has no header, cannot look up organism '{organism}' by name")
+
+    if species_column is not None and organism_name is None:
+        organism_name = f"column_{species_column}"
+    return has_header, query_column, species_column, organism_name
+
+
+def new_cluster_stats(approx, hll_precision):
+    return {'size': 0, 'target': 0,
+            'srrs': HyperLogLog(hll_precision) if approx else set()}
+
+
+def update_cluster_stats(stats, parts, query_column, species_column):
+    """Add one non-C record to a cluster's running counts."""
+    stats['size'] += 1
+    if len(parts) > query_column:
+        srr = extract_srr(parts[query_column])
+        if srr:
+            stats['srrs'].add(srr)
+    if species_column is not None and len(parts) > species_column:
+        try:
+            if int(parts[species_column]) > 0:  # Any positive value indicates organism presence
+                stats['target'] += 1
+        except ValueError:
+            pass
+
+
+def scan_clusters(input_file, approx=False, sample_size=DEFAULT_SAMPLE_SIZE, seed=0,
+                  species_column=None, organism=None, hll_precision=DEFAULT_HLL_PRECISION):
+    """
+    Scan a .uc or TSV file and collect per-cluster statistics.
+
+    In approx mode only the `sample_size` clusters with the smallest hash are kept
+    (bottom-k sampling). Because a cluster's hash is fixed, every record of a
+    sampled cluster is seen regardless of file order; all other lines are rejected
+    after splitting off the first two fields.
+
+    Args:
+        input_file: Path ('.gz'/'.zst' are decompressed), binary stream or
+                    iterable of bytes lines
+
+    Returns:
+        Dictionary with per-cluster stats for the kept clusters plus scan totals
+    """
+    clusters = {}
+    heap = []  # (-hash, cluster) for the sampled clusters, largest hash on top
+    seed_clusters = 0  # S records, one per cluster
+    lines_read = 0
+
+    # Binary mode: lines of unsampled clusters are rejected without being decoded
+    with open_input(input_file, binary=True) as f:
+        f = iter(f)
+        first_line = next(f, b'')
+        has_header, query_column, species_column, organism_name = detect_columns(
+            first_line.decode('utf-8', 'replace'), species_column, organism)
+        lines = f if has_header else itertools.chain([first_line], f)
+        crc32 = zlib.crc32
+        seed = seed & 0xFFFFFFFF
+        threshold = None  # hash of the largest sampled cluster once the sample is full
+
+        for line in lines:
+            lines_read += 1
+            parts = line.split(b'\t', 2)
+            if len(parts) < 3:
+                continue  # blank or truncated line
+            record_type, cluster = parts[0], parts[1]
+            if record_type == b'C' or record_type.startswith(b'#'):
+                continue  # cluster summary records are not members
+            if record_type == b'S':
+                seed_clusters += 1
+
+            stats = clusters.get(cluster)
+            if stats is None:
+                if approx:
+                    # Sample by hash, not by cluster number: numbers follow input order,
+                    # which correlates with cluster size. CRC32 because it runs in C
+                    h = crc32(cluster, seed)
+                    if threshold is not None:
+                        if h >= threshold:
+                            continue
+                        _, evicted = heapq.heapreplace(heap, (-h, cluster))
+                        del clusters[evicted]
+                        threshold = -heap[0][0]
+                    else:
+                        heapq.heappush(heap, (-h, cluster))
+                        if len(heap) >= sample_size:
+                            threshold = -heap[0][0]
+                stats = clusters[cluster] = new_cluster_stats(approx, hll_precision)
+
+            update_cluster_stats(stats, line.decode('utf-8', 'replace').rstrip('\r\n').split('\t'), query_column, species_column)
+
+    total_clusters = seed_clusters
+    if approx and len(heap) >= sample_size and not total_clusters:
+        # No S records (e.g. filtered input): fall back to the k-minimum-values estimate
+        total_clusters = int((sample_size - 1) / ((-heap[0][0] + 1) / 2.0 ** 32))
+    total_clusters = max(total_clusters, len(clusters))
+
+    return {
+        'clusters': clusters,
+        'total_clusters': total_clusters,
+        'lines_read': lines_read,
+        'organism_name': organism_name,
+        'approx': approx,
+        'hll_precision': hll_precision,
+    }
+
+
+def size_bin_labels(edges):
+    """Labels for lower-edge bins, e.g. [1, 2, 3, 6] -> ['1', '2', '3-5', '>=6']."""
+    labels = []
+    for i, low in enumerate(edges):
+        if i + 1 == len(edges):
+            labels.append(f">={low}")
+        elif edges[i + 1] - 1 == low:
+            labels.append(str(low))
+        else:
+            labels.append(f"{low}-{edges[i + 1] - 1}")
+    return labels
+
+
+def fraction_bin(percentage):
+    """Bin index for a percentage: 0 for exactly 0%, then (0,10], ..., (90,100]."""
+    return min(10, math.ceil(percentage / 10))
+
+
+FRACTION_BIN_LABELS = ['0'] + [f"({i * 10},{(i + 1) * 10}]" for i in range(10)]
+
+
+def scale_bin(count, sampled, total):
+    """
+    Scale a sampled bin count to all clusters with a 95% interval.
+
+    Uses the normal approximation to the sampled proportion with a finite
+    population correction; when every cluster was seen the bounds collapse.
+
+    Returns:
+        (estimate, low, high)
+    """
+    if sampled == 0:
+        return 0, 0, 0
+    if sampled >= total:
+        return count, count, count
+    p = count / sampled
+    fpc = (total - sampled) / (total - 1) if total > 1 else 0.0
+    half_width = Z_95 * math.sqrt(p * (1 - p) / sampled * fpc) * total
+    estimate = p * total
+    return round(estimate), max(0, math.floor(estimate - half_width)), min(total, math.ceil(estimate + half_width))
+
+
+def build_histograms(scan, size_bins=DEFAULT_SIZE_BINS):
+    """
+    Build cluster size, species fraction and distinct SRR histograms.
+
+    Returns:
+        List of (metric, bin_label, estimate, low, high, fraction) rows
+    """
+    clusters = scan['clusters']
+    sampled = len(clusters)
+    total = scan['total_clusters']
+    labels = size_bin_labels(size_bins)
+
+    size_counts = [0] * len(size_bins)
+    srr_counts = [0] * len(size_bins)
+    fraction_counts = [0] * len(FRACTION_BIN_LABELS)
+    for stats in clusters.values():
+        size_counts[max(0, bisect.bisect_right(size_bins, stats['size']) - 1)] += 1
+        n_srrs = len(stats['srrs'])
+        srr_counts[max(0, bisect.bisect_right(size_bins, n_srrs) - 1)] += 1
+        if stats['size']:
+            fraction_counts[fraction_bin(stats['target'] / stats['size'] * 100)] += 1
+
+    metrics = [('cluster_size', labels, size_counts), ('distinct_srrs', labels, srr_counts)]
+    if scan['organism_name']:
+        metrics.append((f"{scan['organism_name']}_pct", FRACTION_BIN_LABELS, fraction_counts))
+
+    rows = []
+    for metric, bin_labels, counts in metrics:
+        for label, count in zip(bin_labels, counts):
+            estimate, low, high = scale_bin(count, sampled, total)
+            fraction = count / sampled if sampled else 0.0
+            rows.append((metric, label, estimate, low, high, fraction))
+    return rows
+
+
+def write_histograms(rows, output_file):
+    """Write histogram rows to a TSV file."""
+    with open(output_file, 'w') as f:
+        f.write("metric\tbin\tclusters\tci95_low\tci95_high\tfraction\n")
+        for metric, label, estimate, low, high, fraction in rows:
+            f.write(f"{metric}\t{label}\t{estimate}\t{low}\t{high}\t{fraction:.4f}\n")
+
+
+def print_histograms(rows):
+    """Print histogram rows as aligned tables, one per metric."""
+    current = None
+    for metric, label, estimate, low, high, fraction in rows:
+        if metric != current:
+            current = metric
+            print(f"\n{metric}")
+            print(f"  {'bin':>12} {'clusters':>10} {'95% interval':>23} {'fraction':>9}")
+        print(f"  {label:>12} {estimate:>10} {f'[{low}, {high}]':>23} {fraction:>9.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Cluster size, species fraction and distinct SRR histograms from a .uc or TSV file',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python3 stats.py circ_clusters.uc --approx
+  python3 stats.py SRR.linked.triple.circles.tsv --approx --organism Saccharomyces
+  python3 stats.py SRR.linked.triple.circles.tsv -c 10 -o stats.tsv
+        """
+    )
+    parser.add_argument('input_file', help='Input .uc file, Polymorph output or annotated TSV')
+    parser.add_argument('--approx', action='store_true',
+                        help='Sample clusters and sketch distinct SRRs instead of exact counts')
+    parser.add_argument('-k', '--sample-size', type=int, default=DEFAULT_SAMPLE_SIZE,
+                        help=f'Number of clusters to sample in --approx mode (default: {DEFAULT_SAMPLE_SIZE})')
+    parser.add_argument('--seed', type=int, default=0, help='Sampling seed (default: 0)')
+    parser.add_argument('--hll-precision', type=int, default=DEFAULT_HLL_PRECISION,
+                        help=f'HyperLogLog precision in --approx mode, 4-16 (default: {DEFAULT_HLL_PRECISION})')
+    parser.add_argument('-c', '--column', type=int,
+                        help='Target organism column index (0-based), e.g. 10 for Saccharomyces')
+    parser.add_argument('--organism', type=str,
+                        help='Target organism name (for column lookup by name instead of index)')
+    parser.add_argument('--size-bins', default=','.join(map(str, DEFAULT_SIZE_BINS)),
+                        help='Comma-separated lower edges for size/SRR bins (default: %(default)s)')
+    parser.add_argument('-o', '--output', help='Also write histograms to this TSV file')
+
+    args = parser.parse_args(argv)
+
+    if args.input_file != '-' and not Path(args.input_file).exists():
+        print(f"Error: Input file '{args.input_file}' not found")
+        return 1
+    if args.sample_size < 2:
+        print("Error: --sample-size must be at least 2")
+        return 1
+
+    try:
+        size_bins = sorted({int(edge) for edge in args.size_bins.split(',')})
+        start = time.time()
+        scan = scan_clusters(args.input_file, approx=args.approx, sample_size=args.sample_size,
+                             seed=args.seed, species_column=args.column, organism=args.organism,
+                             hll_precision=args.hll_precision)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    elapsed = time.time() - start
+
+    rows = build_histograms(scan, size_bins)
+
+    print(f"Mode: {'approximate' if args.approx else 'exact'}")
+    print(f"Lines read: {scan['lines_read']}")
+    print(f"Clusters: {scan['total_clusters']}")
+    print(f"Clusters in statistics: {len(scan['clusters'])}")
+    if args.approx:
+        print(f"Distinct SRR counts: HyperLogLog, ~{HyperLogLog(args.hll_precision).relative_error:.1%} "
+              f"relative error per cluster (not included in the intervals below)")
+    if not scan['organism_name']:
+        print("No organism column given (-c/--organism), skipping species fraction")
+    print(f"Time: {elapsed:.1f}s")
+
+    print_histograms(rows)
+
+    if args.output:
+        write_histograms(rows, args.output)
+        print(f"\nHistograms written to: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,104 @@
+"""
+Input/output helpers shared by the RNAlab stages.
+
+Every stage accepts either a path or something already open, so stages can be
+chained in-process (a notebook can hand the output stream of one stage to the
+next) as well as run on files from the command line:
+
+  - str / Path: opened here and closed afterwards; '-' means stdin/stdout,
+    '.gz' and '.zst' files are (de)compressed on the fly
+  - file objects and other iterables of lines: used as they are, never closed
+
+zstandard is only imported when a .zst file is actually opened, so the package
+stays fast to import when it is not installed or not needed.
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+
+def is_path(source):
+    """True if `source` names a file rather than being an open stream or iterable."""
+    return isinstance(source, (str, os.PathLike))
+
+
+def is_std_stream(source):
+    """True if `source` is '-' (stdin/stdout)."""
+    return is_path(source) and os.fspath(source) == '-'
+
+
+def status_stream(destination):
+    """
+    Where a stage writing to `destination` should print its status messages.
+
+    stderr when the data itself goes to stdout ('-'), so messages never end up
+    in the output; stdout otherwise, as the scripts always did.
+    """
+    return sys.stderr if is_std_stream(destination) else sys.stdout
+
+
+def _open_compressed(path, mode):
+    path = os.fspath(path)
+    if path.endswith('.gz'):
+        import gzip
+        # Level 6 like the gzip command line; gzip.open defaults to the much slower level 9
+        return gzip.open(path, mode if 'b' in mode else mode + 't', compresslevel=6)
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(f"Reading or writing '{path}' needs the zstandard package "
+                              f"(pip install zstandard)") from None
+        return zstandard.open(path, mode if 'b' in mode else mode + 't')
+    return open(path, mode, newline='' if 'b' not in mode else None)
+
+
+@contextlib.contextmanager
+def open_input(source, binary=False):
+    """
+    Open `source` for reading.
+
+    Args:
+        source: Path, '-' for stdin, open file object or iterable of lines
+        binary: Yield a binary stream instead of text
+
+    Yields:
+        An iterable of lines (str, or bytes if binary)
+    """
+    if not is_path(source):
+        yield source
+        return
+    if os.fspath(source) == '-':
+        yield sys.stdin.buffer if binary else sys.stdin
+        return
+    with _open_compressed(source, 'rb' if binary else 'r') as f:
+        yield f
+
+
+@contextlib.contextmanager
+def open_output(destination, binary=False):
+    """
+    Open `destination` for writing.
+
+    Args:
+        destination: Path, '-' for stdout or open file object
+        binary: Yield a binary stream instead of text
+
+    Yields:
+        A writable file object
+    """
+    if not is_path(destination):
+        yield destination
+        return
+    if os.fspath(destination) == '-':
+        yield sys.stdout.buffer if binary else sys.stdout
+        return
+    with _open_compressed(destination, 'wb' if binary else 'w') as f:
+        yield f
+
+
+def is_text_stream(stream):
+    """True if `stream` expects str rather than bytes."""
+    return isinstance(stream, io.TextIOBase)
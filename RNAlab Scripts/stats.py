@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""
+Command-line wrapper for rnalab.stats (installed as `rnalab-stats` by pip install).
+"""
+
+from rnalab.stats import main
+
+if __name__ == "__main__":
+    exit(main())